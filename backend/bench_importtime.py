@@ -0,0 +1,150 @@
+"""
+Import-time benchmark for the chat backend.
+
+Runs `python -X importtime` on a fresh interpreter that boots Django and imports
+the chat modules (what every worker, `manage.py migrate` and test run pays), then
+prints the slowest imports.
+
+Wall-clock times differ between machines, so the timing check is relative: in
+each run, the time spent on imports beyond those a bare `django.setup()` makes
+is divided by the time spent on the setup ones. Both come from the same
+process, so machine speed and load mostly cancel out. The median ratio is
+compared with the one stored in bench_importtime_baseline.json.
+
+Fails (exit code 1) if:
+  - a provider SDK (e.g. google.generativeai) is imported at load time, or
+  - the ratio is more than --max-regression above the baseline.
+
+Usage:
+    python bench_importtime.py [--max-regression 0.25] [--runs 5] [--top 15]
+    python bench_importtime.py --update-baseline   # after an intended change
+
+The baseline ratio is still somewhat machine-specific (disk, CPU cache), so
+refresh it with --update-baseline on the machine that runs the check.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+BASELINE_FILE = BACKEND_DIR / 'bench_importtime_baseline.json'
+
+# Heavy SDKs that must stay lazy (see chat/providers.py)
+FORBIDDEN_MODULES = ['google.generativeai']
+
+SETUP_SNIPPET = "import django; django.setup()"
+IMPORT_SNIPPET = f"{SETUP_SNIPPET}; import chat.ai_utils, chat.consumers, chat.views, chat.routing"
+
+
+def django_env():
+    """
+    Environment for a fresh interpreter that can run django.setup().
+    """
+    env = os.environ.copy()
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    env.setdefault('SECRET_KEY', 'bench')
+    env.setdefault('ALLOWED_HOSTS', 'localhost')
+    return env
+
+
+def measure_imports(snippet=IMPORT_SNIPPET):
+    """
+    Returns a dict {module_name: cumulative_microseconds} for one cold import.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', snippet],
+        cwd=BACKEND_DIR, env=django_env(), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import failed:\n{result.stderr}")
+
+    # Lines look like: "import time:       self [us] |  cumulative | imported package"
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        # Keep the indentation: it marks how deeply an import is nested
+        timings[parts[2][1:].rstrip()] = int(parts[1].strip())
+    return timings
+
+
+def top_level_total(timings):
+    # Cumulative times nest, so only top-level imports (no leading spaces) are summed
+    return sum(us for name, us in timings.items() if name == name.lstrip())
+
+
+def overhead_ratio(timings, setup_modules):
+    # Top-level imports made by django.setup() are shared by both snippets;
+    # everything else is what our own modules add on top
+    setup_us = sum(us for name, us in timings.items() if name in setup_modules)
+    return (top_level_total(timings) - setup_us) / setup_us
+
+
+def load_baseline():
+    if not BASELINE_FILE.exists():
+        return None
+    return json.loads(BASELINE_FILE.read_text())['ratio']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--baseline-ratio', type=float, default=None, help="Overrides the stored baseline")
+    parser.add_argument('--max-regression', type=float, default=0.25, help="Allowed ratio increase, 0.25 = 25%%")
+    parser.add_argument('--update-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--runs', type=int, default=5, help="Cold imports to measure; the fastest is kept")
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    setup_modules = {name for name in measure_imports(SETUP_SNIPPET) if name == name.lstrip()}
+    runs = [measure_imports() for _ in range(max(args.runs, 1))]
+    ratio = statistics.median(overhead_ratio(timings, setup_modules) for timings in runs)
+
+    # The fastest run is the least disturbed by other load on the machine
+    timings = min(runs, key=top_level_total)
+    total_ms = top_level_total(timings) / 1000
+
+    print(f"--- SLOWEST {args.top} IMPORTS (cumulative) ---")
+    slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for name, us in slowest:
+        print(f"{us / 1000:8.1f} ms  {name.strip()}")
+
+    failed = False
+    loaded = {name.strip() for name in timings}
+    for module in FORBIDDEN_MODULES:
+        if module in loaded:
+            print(f"❌ {module} is imported at load time. Keep it behind chat/providers.py.")
+            failed = True
+
+    print(f"\nTotal: {total_ms:.1f} ms, overhead vs django.setup() imports: {ratio:.3f} (median)")
+
+    if args.update_baseline:
+        BASELINE_FILE.write_text(json.dumps({'ratio': round(ratio, 3)}) + '\n')
+        print("Saved as new baseline ratio")
+        return 1 if failed else 0
+
+    baseline_ratio = args.baseline_ratio or load_baseline()
+    if baseline_ratio is None:
+        print("❌ No baseline found. Run with --update-baseline first.")
+        return 1
+
+    limit = baseline_ratio * (1 + args.max_regression)
+    change = ratio / baseline_ratio - 1
+    print(f"Baseline ratio {baseline_ratio:.3f} ({change:+.0%}, limit {limit:.3f})")
+    if ratio > limit:
+        print("❌ Import time regressed past the allowed limit.")
+        failed = True
+
+    if not failed:
+        print("✓ OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,8 @@
-import os
-import google.generativeai as genai
-from django.conf import settings
+import json
+import re
+from .providers import get_provider
 
-# 1. Configure the API
-genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
+# 1. The provider SDK is imported lazily on first use (see providers.py)
 
 # 2. GLOBAL SYSTEM INSTRUCTIONS (Hardcoded for all chats)
 SYSTEM_INSTRUCTION = """
@@ -24,20 +23,76 @@ def get_ai_response(history_messages, user_input):
         user_input: String
     """
     try:
-        # 3. Initialize Model with the Global Instruction
-        model = genai.GenerativeModel(
-            "gemini-2.0-flash",
-            system_instruction=SYSTEM_INSTRUCTION
-        )
+        # 3. Start Chat with History and the Global Instruction, then Send Message
+        response = get_provider().chat(history_messages, user_input, system_instruction=SYSTEM_INSTRUCTION)
 
-        # 4. Start Chat with History
-        chat = model.start_chat(history=history_messages)
-
-        # 5. Send Message
-        response = chat.send_message(user_input)
-        
-        return response.text.strip()
+        return response.strip()
 
     except Exception as e:
         print(f"AI Error: {e}")
-        return "I am currently experiencing connection issues with my brain. Please try again in a moment."
\ No newline at end of file
+        return "I am currently experiencing connection issues with my brain. Please try again in a moment."
+
+def generate_title(first_message):
+    """
+    Returns a short title for a chat. Errors are left to the caller.
+    """
+    response = get_provider().generate(f"Summarize in 3 words: {first_message}")
+    return response.strip().replace('"', '')
+
+# Longest slice of each message that goes into a batched title prompt
+TITLE_PROMPT_MAX_CHARS = 500
+
+def generate_titles(first_messages, provider=None):
+    """
+    Titles many chats with ONE provider call.
+    Args:
+        first_messages: List of strings (first user message of each chat)
+    Returns:
+        List of titles in the same order (None where the model gave no title).
+    """
+    provider = provider or get_provider()
+
+    items = "\n".join(
+        f"[{i}] {' '.join(message.split())[:TITLE_PROMPT_MAX_CHARS]}"
+        for i, message in enumerate(first_messages, start=1)
+    )
+    prompt = (
+        "Summarize each chat below in 3 words.\n"
+        'Reply with only a JSON object mapping each number to its title, e.g. {"1": "Title", "2": "Title"}.\n\n'
+        f"{items}"
+    )
+    response = provider.generate(prompt)
+
+    titles = _first_json_object(response)
+
+    results = []
+    for i in range(1, len(first_messages) + 1):
+        title = str(titles.get(str(i)) or '').strip().replace('"', '')
+        results.append(title or None)
+    return results
+
+def _first_json_object(text):
+    """
+    Returns the first JSON object in `text`, or {} if there is none.
+    Models like to wrap JSON in ```json fences or add prose around it.
+    """
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"\{", text):
+        try:
+            value, _ = decoder.raw_decode(text, match.start())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict):
+            return value
+    return {}
+
+def warm_up():
+    """
+    Builds the provider client ahead of the first request (called from asgi.py).
+    The provider bounds any network call it makes with a short timeout, and
+    failures are logged, never raised, so startup is delayed by seconds at most.
+    """
+    try:
+        get_provider().warm_up(system_instruction=SYSTEM_INSTRUCTION)
+    except Exception as e:
+        print(f"AI Warm-up Error: {e}")
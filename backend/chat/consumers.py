@@ -3,8 +3,7 @@ import time
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from .models import ChatSession, Message
-from .ai_utils import get_ai_response
-import google.generativeai as genai
+from .ai_utils import get_ai_response, generate_title
 
 class ChatConsumer(AsyncWebsocketConsumer):
     RATE_LIMIT_SECONDS = 0.5
@@ -105,8 +104,6 @@ class ChatConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def generate_smart_title(self, session, first_message):
         try:
-            model = genai.GenerativeModel("gemini-2.0-flash")
-            response = model.generate_content(f"Summarize in 3 words: {first_message}")
-            session.title = response.text.strip().replace('"', '')
+            session.title = generate_title(first_message)
             session.save()
         except: pass
\ No newline at end of file
@@ -0,0 +1,137 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import OuterRef, Subquery
+
+from chat.ai_utils import generate_titles
+from chat.models import ChatSession, Message
+from chat.providers import get_provider
+
+DEFAULT_TITLE = "New Chat"
+TITLE_MAX_LENGTH = ChatSession._meta.get_field('title').max_length
+
+
+class Command(BaseCommand):
+    help = (
+        'Titles every session still called "New Chat", many sessions per LLM call. '
+        "Progress is checkpointed, so an interrupted run picks up where it stopped. "
+        "The checkpoint never moves past a failed or partly titled batch, so re-running retries them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=25, help="Sessions titled per LLM call")
+        parser.add_argument('--concurrency', type=int, default=4, help="LLM calls in flight at once")
+        parser.add_argument(
+            '--checkpoint',
+            default=str(settings.BASE_DIR / '.backfill_titles.json'),
+            help="File storing the last processed session id",
+        )
+        parser.add_argument('--reset', action='store_true', help="Ignore the checkpoint and rescan from the first session")
+        parser.add_argument('--provider', default=None, help="AI provider name (defaults to settings.AI_PROVIDER)")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        concurrency = options['concurrency']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if concurrency < 1:
+            raise CommandError("--concurrency must be at least 1")
+        checkpoint = Path(options['checkpoint'])
+        provider = get_provider(options['provider'])
+
+        last_id = 0 if options['reset'] else self.load_checkpoint(checkpoint)
+        if last_id:
+            self.stdout.write(f"Resuming after session {last_id}")
+
+        # `last_id` is how far this run has read. `checkpoint_id` stops at the
+        # first batch that was not fully titled, so a re-run retries it.
+        checkpoint_id = last_id
+        checkpoint_blocked = False
+        titled = failed = skipped = 0
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while True:
+                # 1. Read one wave of batches in keyset order (id > last_id)
+                batches = []
+                for _ in range(concurrency):
+                    batch = self.next_batch(last_id, batch_size)
+                    if not batch:
+                        break
+                    batches.append(batch)
+                    last_id = batch[-1].id
+                if not batches:
+                    break
+
+                # 2. One LLM call per batch, at most `concurrency` at a time.
+                # Worker threads never touch the database.
+                futures = [pool.submit(self.title_batch, provider, batch) for batch in batches]
+                updated = []
+                for batch, future in zip(batches, futures):
+                    sessions, batch_failed = future.result()
+                    updated.extend(sessions)
+                    failed += batch_failed
+                    skipped += len(batch) - len(sessions) - batch_failed
+                    if batch_failed:
+                        checkpoint_blocked = True
+                    elif not checkpoint_blocked:
+                        checkpoint_id = batch[-1].id
+
+                # 3. Write back, then checkpoint. Only rows still titled "New Chat"
+                # are touched, so a rename (or live auto-title) made while the
+                # LLM was busy wins over the backfill.
+                titled += ChatSession.objects.filter(title=DEFAULT_TITLE).bulk_update(updated, ['title'])
+                self.save_checkpoint(checkpoint, checkpoint_id)
+                self.stdout.write(f"Titled {titled} sessions (read up to id {last_id})")
+
+        summary = f"Done. Titled {titled} sessions, skipped {skipped} without messages"
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{summary}, {failed} failed. Re-run to retry them."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{summary}."))
+
+    def next_batch(self, last_id, batch_size):
+        first_message = Message.objects.filter(
+            session=OuterRef('pk'), is_user=True
+        ).order_by('created_at', 'id').values('content')[:1]
+
+        return list(
+            ChatSession.objects.filter(title=DEFAULT_TITLE, id__gt=last_id)
+            .annotate(first_message=Subquery(first_message))
+            .order_by('id')
+            .only('id', 'title')[:batch_size]
+        )
+
+    def title_batch(self, provider, batch):
+        """
+        Returns (sessions that got a title, number that should have but didn't).
+        Sessions without messages are skipped and stay "New Chat".
+        """
+        sessions = [session for session in batch if session.first_message]
+        if not sessions:
+            return [], 0
+        try:
+            titles = generate_titles([session.first_message for session in sessions], provider=provider)
+        except Exception as e:
+            self.stderr.write(f"Batch {sessions[0].id}-{sessions[-1].id} failed: {e}")
+            return [], len(sessions)
+
+        updated = []
+        for session, title in zip(sessions, titles):
+            if title:
+                session.title = title[:TITLE_MAX_LENGTH]
+                updated.append(session)
+        return updated, len(sessions) - len(updated)
+
+    def load_checkpoint(self, path):
+        if not path.exists():
+            return 0
+        return json.loads(path.read_text()).get('last_id', 0)
+
+    def save_checkpoint(self, path, last_id):
+        # Write then rename, so an interrupted run never leaves a truncated file
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_text(json.dumps({'last_id': last_id}))
+        os.replace(tmp_path, path)
@@ -0,0 +1,78 @@
+import os
+import threading
+from django.conf import settings
+
+# Provider SDKs are slow to import, so nothing here touches them at module load.
+# A provider is only built (and its SDK imported) the first time it is requested.
+
+_FACTORIES = {}
+_INSTANCES = {}
+_lock = threading.Lock()
+
+
+def register_provider(name, factory):
+    """
+    Register a callable that builds the provider called `name`.
+    Re-registering a name drops any cached instance (handy for tests).
+    """
+    with _lock:
+        _FACTORIES[name] = factory
+        _INSTANCES.pop(name, None)
+
+
+def get_provider(name=None):
+    """
+    Return the (cached) provider instance, building it on first use.
+    Defaults to settings.AI_PROVIDER.
+    """
+    name = name or getattr(settings, 'AI_PROVIDER', 'gemini')
+    provider = _INSTANCES.get(name)
+    if provider is None:
+        with _lock:
+            provider = _INSTANCES.get(name)
+            if provider is None:
+                if name not in _FACTORIES:
+                    raise KeyError(f"Unknown AI provider: {name}")
+                provider = _FACTORIES[name]()
+                _INSTANCES[name] = provider
+    return provider
+
+
+class GeminiProvider:
+    MODEL_NAME = "gemini-2.0-flash"
+    # Warm-up runs before the worker accepts traffic, so it must never hang
+    WARMUP_TIMEOUT_SECONDS = 5
+
+    def __init__(self, api_key=None):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key or os.getenv('GEMINI_API_KEY'))
+        self._genai = genai
+        self._models = {}
+
+    def _model(self, system_instruction=None):
+        # One GenerativeModel per system instruction, reused across requests
+        model = self._models.get(system_instruction)
+        if model is None:
+            model = self._genai.GenerativeModel(self.MODEL_NAME, system_instruction=system_instruction)
+            self._models[system_instruction] = model
+        return model
+
+    def chat(self, history, user_input, system_instruction=None):
+        chat = self._model(system_instruction).start_chat(history=history)
+        return chat.send_message(user_input).text
+
+    def generate(self, prompt):
+        return self._model().generate_content(prompt).text
+
+    def warm_up(self, system_instruction=None):
+        # Build the models we will need, then make one free count_tokens call.
+        # That creates the SDK's shared generative client (the one chat and
+        # generate use) and opens its connection before the first user request.
+        self._model()
+        self._model(system_instruction).count_tokens(
+            "ping",
+            # No retries: the SDK's default retry policy would keep trying for 60s
+            request_options={'timeout': self.WARMUP_TIMEOUT_SECONDS, 'retry': None},
+        )
+
+register_provider('gemini', GeminiProvider)
@@ -1,3 +1,264 @@
-from django.test import TestCase
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import types
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from bench_importtime import BACKEND_DIR, django_env
+from . import ai_utils
+from .management.commands.backfill_titles import Command as BackfillTitlesCommand
+from .models import ChatSession, Message
+from .providers import GeminiProvider, get_provider, register_provider
+
+
+class FakeProvider:
+    def __init__(self):
+        self.calls = 0
+        self.warmed_up = False
+
+    def chat(self, history, user_input, system_instruction=None):
+        self.calls += 1
+        return f" echo: {user_input} "
+
+    def generate(self, prompt):
+        self.calls += 1
+        return '"Fake Title"'
+
+    def warm_up(self, system_instruction=None):
+        self.warmed_up = True
+
+
+class ProviderRegistryTests(SimpleTestCase):
+    def setUp(self):
+        register_provider('fake', FakeProvider)
+
+    def test_provider_is_built_once_and_cached(self):
+        self.assertIs(get_provider('fake'), get_provider('fake'))
+
+    def test_unknown_provider_raises(self):
+        with self.assertRaises(KeyError):
+            get_provider('missing')
+
+    def test_ai_utils_use_configured_provider(self):
+        with self.settings(AI_PROVIDER='fake'):
+            self.assertEqual(ai_utils.get_ai_response([], "hi"), "echo: hi")
+            self.assertEqual(ai_utils.generate_title("hi"), "Fake Title")
+            ai_utils.warm_up()
+            self.assertTrue(get_provider().warmed_up)
+
+
+def make_stub_genai():
+    """
+    A minimal google.generativeai: models get their client lazily from one
+    shared default generative client, like the real SDK.
+    """
+    genai = types.ModuleType('google.generativeai')
+    genai.generative_clients = []
+    genai.count_tokens_calls = []
+
+    def get_default_generative_client():
+        if not genai.generative_clients:
+            genai.generative_clients.append(object())
+        return genai.generative_clients[0]
+
+    class GenerativeModel:
+        def __init__(self, model_name, system_instruction=None):
+            self._client = None
+
+        def count_tokens(self, contents, request_options=None):
+            if self._client is None:
+                self._client = get_default_generative_client()
+            genai.count_tokens_calls.append(request_options)
+
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = GenerativeModel
+    return genai
+
+
+class GeminiProviderTests(SimpleTestCase):
+    def test_warm_up_creates_the_generative_client(self):
+        genai = make_stub_genai()
+        google = types.ModuleType('google')
+        google.generativeai = genai
+        with mock.patch.dict(sys.modules, {'google': google, 'google.generativeai': genai}):
+            provider = GeminiProvider(api_key='test')
+            provider.warm_up(system_instruction="S")
+
+        self.assertEqual(len(genai.generative_clients), 1)
+        self.assertIs(provider._models["S"]._client, genai.generative_clients[0])
+        self.assertEqual(
+            genai.count_tokens_calls,
+            [{'timeout': GeminiProvider.WARMUP_TIMEOUT_SECONDS, 'retry': None}],
+        )
+
+
+class ImportTimeTests(SimpleTestCase):
+    # Runs in a fresh interpreter with a stub SDK on the path, so the check
+    # works whether or not google-generativeai is installed
+    LAZY_IMPORT_SCRIPT = """
+import sys, django
+django.setup()
+import chat.ai_utils, chat.consumers
+assert 'google.generativeai' not in sys.modules, 'SDK imported at load time'
+from chat.providers import get_provider
+get_provider('gemini')
+assert 'google.generativeai' in sys.modules, 'SDK not imported on first use'
+"""
+
+    def test_provider_sdk_is_imported_only_on_first_use(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        stub_dir = Path(tmp.name)
+        (stub_dir / 'google' / 'generativeai').mkdir(parents=True)
+        (stub_dir / 'google' / '__init__.py').write_text('')
+        (stub_dir / 'google' / 'generativeai' / '__init__.py').write_text('def configure(**kwargs): pass\n')
+
+        env = django_env()
+        env['PYTHONPATH'] = str(stub_dir)
+        result = subprocess.run(
+            [sys.executable, '-c', self.LAZY_IMPORT_SCRIPT],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+class FakeTitleProvider:
+    """
+    Answers batched title prompts with {"1": "Title 1", ...} and counts calls.
+    Set `fail_next` to make the next N calls raise.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.fail_next = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt):
+        with self._lock:
+            self.calls += 1
+            if self.fail_next:
+                self.fail_next -= 1
+                raise ConnectionError("provider down")
+        numbers = re.findall(r"^\[(\d+)\]", prompt, re.MULTILINE)
+        return "```json\n" + json.dumps({n: f"Title {n}" for n in numbers}) + "\n```"
+
+
+class GenerateTitlesTests(SimpleTestCase):
+    def titles_for(self, response, count=2):
+        provider = FakeProvider()
+        provider.generate = lambda prompt: response
+        return ai_utils.generate_titles(["a"] * count, provider=provider)
+
+    def test_uses_first_json_object(self):
+        self.assertEqual(self.titles_for('{"1": "A"} and also {"2": "B"}'), ["A", None])
+        self.assertEqual(self.titles_for('Sure! {oops} ```json\n{"2": "B"}\n```'), [None, "B"])
+
+    def test_non_object_reply_gives_no_titles(self):
+        self.assertEqual(self.titles_for('["A", "B"]'), [None, None])
+        self.assertEqual(self.titles_for('no json here'), [None, None])
+
+
+class BackfillTitlesTests(TestCase):
+    def setUp(self):
+        register_provider('fake-titles', FakeTitleProvider)
+        self.provider = get_provider('fake-titles')
+        self.user = User.objects.create_user(username='tester', password='pw')
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.checkpoint = Path(tmp.name) / 'checkpoint.json'
+
+    def make_sessions(self, count, title="New Chat"):
+        sessions = []
+        for i in range(count):
+            session = ChatSession.objects.create(user=self.user, title=title)
+            Message.objects.create(session=session, content=f"question {i}", is_user=True)
+            sessions.append(session)
+        return sessions
+
+    def backfill(self, *args):
+        call_command(
+            'backfill_titles', '--provider', 'fake-titles', '--checkpoint', str(self.checkpoint),
+            *args, stdout=StringIO(), stderr=StringIO(),
+        )
+
+    def test_titles_many_sessions_per_call(self):
+        self.make_sessions(7)
+        kept = self.make_sessions(1, title="Already Titled")[0]
+        empty = ChatSession.objects.create(user=self.user, title="New Chat")
+
+        self.backfill('--batch-size', '3', '--concurrency', '2')
+
+        self.assertEqual(self.provider.calls, 3)
+        self.assertEqual(ChatSession.objects.filter(title="New Chat").get(), empty)
+        kept.refresh_from_db()
+        self.assertEqual(kept.title, "Already Titled")
+
+    def test_resumes_from_checkpoint(self):
+        first, second = self.make_sessions(2)
+        self.checkpoint.write_text(json.dumps({'last_id': first.id}))
+
+        self.backfill('--batch-size', '10')
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.title, "New Chat")
+        self.assertEqual(second.title, "Title 1")
+        self.assertEqual(self.provider.calls, 1)
+        self.assertEqual(json.loads(self.checkpoint.read_text()), {'last_id': second.id})
+
+        self.backfill('--reset')
+        first.refresh_from_db()
+        self.assertEqual(first.title, "Title 1")
+        self.assertEqual(self.provider.calls, 2)
+
+    def test_failed_batch_is_retried_on_next_run(self):
+        sessions = self.make_sessions(4)
+        self.provider.fail_next = 1
+
+        self.backfill('--batch-size', '2', '--concurrency', '1')
+
+        self.assertEqual(ChatSession.objects.filter(title="New Chat").count(), 2)
+        self.assertEqual(json.loads(self.checkpoint.read_text()), {'last_id': 0})
+
+        self.backfill('--batch-size', '2')
+
+        self.assertFalse(ChatSession.objects.filter(title="New Chat").exists())
+        self.assertEqual(json.loads(self.checkpoint.read_text()), {'last_id': sessions[1].id})
+        self.assertEqual(self.provider.calls, 3)
+
+    def test_rejects_non_positive_options(self):
+        for option in ('--batch-size', '--concurrency'):
+            with self.assertRaises(CommandError):
+                self.backfill(option, '0')
+        self.assertEqual(self.provider.calls, 0)
+
+    def test_rename_during_backfill_is_kept(self):
+        renamed, other = self.make_sessions(2)
+
+        class RenameAfterRead(BackfillTitlesCommand):
+            def next_batch(self, last_id, batch_size):
+                batch = super().next_batch(last_id, batch_size)
+                if last_id == 0:
+                    # The user renames the chat while its title is being generated
+                    ChatSession.objects.filter(id=renamed.id).update(title="My Rename")
+                return batch
+
+        out = StringIO()
+        call_command(
+            RenameAfterRead(), '--provider', 'fake-titles', '--checkpoint', str(self.checkpoint),
+            stdout=out, stderr=StringIO(),
+        )
+
+        renamed.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(renamed.title, "My Rename")
+        self.assertEqual(other.title, "Title 2")
+        self.assertIn("Titled 1 sessions", out.getvalue())
@@ -1,14 +1,24 @@
 import os
+from django.conf import settings
 from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+# Set up Django before importing anything that touches models (chat.middleware)
+django_asgi_app = get_asgi_application()
+
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
 from chat.middleware import CookieAuthMiddleware
 import chat.routing
+from chat.ai_utils import warm_up
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+# Pre-create the AI client before this worker accepts traffic
+if settings.AI_WARMUP:
+    warm_up()
 
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_app,
     "websocket": AllowedHostsOriginValidator(  # 1. Checks Allowed Hosts (Security)
         CookieAuthMiddleware(                  # 2. Checks Cookies (Auth)
             URLRouter(
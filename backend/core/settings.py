@@ -62,6 +62,12 @@ DATABASES = {
     }
 }
 
+# --- AI PROVIDER ---
+# Provider SDKs are imported lazily (chat/providers.py).
+# Set AI_WARMUP=True to build the client at ASGI startup instead of on the first message.
+AI_PROVIDER = os.getenv('AI_PROVIDER', 'gemini')
+AI_WARMUP = os.getenv('AI_WARMUP') == 'True'
+
 # --- CHANNEL LAYER (In-Memory for Dev) ---
 CHANNEL_LAYERS = {
     "default": {